@@ -10,21 +10,60 @@ Register for API key at: https://api.fdic.gov/banks/docs/
 """
 
 import argparse
+import asyncio
 import os
+import aiohttp
 import requests
 import json
+from aiolimiter import AsyncLimiter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional: faster JSON serialization
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # API Configuration
 BASE_URL = "https://api.fdic.gov/banks"
 DOCS_URL = "https://api.fdic.gov/banks/docs"
 MAX_LIMIT = 10000  # API maximum per request
 DEFAULT_DELAY = 0.5  # Seconds between requests
+MAX_CONCURRENT_REQUESTS = 8  # Concurrent page requests per endpoint
+MAX_REQUESTS_PER_SECOND = 10  # Client-side rate limit, shared by all endpoints in a run
+MAX_RETRIES = 5  # Retries on rate-limit / transient server errors
+RETRY_BACKOFF = 0.5  # Exponential backoff factor (seconds)
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Shared HTTP session: pooled connections + retry on transient errors
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=MAX_RETRIES,
+            backoff_factor=RETRY_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+        ),
+    ),
+)
+SESSION.headers.update({"Accept-Encoding": "gzip"})
 
 # Output directories
 PROJECT_ROOT = Path(__file__).parent
 RAW_DATA_DIR = PROJECT_ROOT / "data" / "raw"
+ETAG_CACHE_FILE = RAW_DATA_DIR / ".etag_cache.json"
+
+# Data endpoints downloaded by this script
+DATA_ENDPOINTS = ["failures", "institutions"]
 
 # YAML definition files
 YAML_FILES = {
@@ -33,97 +72,209 @@ YAML_FILES = {
 }
 
 
-def fetch_endpoint(endpoint: str, params: dict = None, api_key: str = None) -> dict:
-    """Fetch data from FDIC API endpoint."""
+def retry_delay(retry_after: str | None, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given, else exponential backoff."""
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return RETRY_BACKOFF * 2 ** attempt
+
+
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    endpoint: str,
+    offset: int,
+    params: dict = None,
+    api_key: str = None,
+    limiter: AsyncLimiter = None,
+) -> dict:
+    """
+    Fetch a single page of records from FDIC API endpoint.
+
+    Requests are paced by limiter (if given); rate-limit and transient server
+    errors (RETRY_STATUSES) are retried up to MAX_RETRIES times, honoring the
+    Retry-After header.
+    """
     url = f"{BASE_URL}/{endpoint}"
-    default_params = {
-        "format": "json",
-        "limit": MAX_LIMIT,
-        "offset": 0,
-    }
+    page_params = {"format": "json"}
     if params:
-        default_params.update(params)
+        page_params.update(params)
+    page_params["offset"] = offset
+    page_params["limit"] = MAX_LIMIT
     if api_key:
-        default_params["api_key"] = api_key
-
-    response = requests.get(url, params=default_params)
-    response.raise_for_status()
-    return response.json()
+        page_params["api_key"] = api_key
+
+    print(f"  Fetching {endpoint} offset={offset}...")
+    for attempt in range(MAX_RETRIES + 1):
+        async with limiter or nullcontext():
+            async with session.get(url, params=page_params) as response:
+                if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+                delay = retry_delay(response.headers.get("Retry-After"), attempt)
+
+        print(
+            f"  HTTP {response.status} on {endpoint} offset={offset}, "
+            f"retrying in {delay:.1f}s..."
+        )
+        await asyncio.sleep(delay)
+
+
+async def fetch_all_records_async(
+    endpoint: str, params: dict = None, api_key: str = None, limiter: AsyncLimiter = None
+) -> list:
+    """
+    Fetch all records from an endpoint, requesting pages concurrently.
+
+    The first page is fetched on its own to read meta.total; the remaining
+    pages are then requested concurrently, bounded by MAX_CONCURRENT_REQUESTS.
+    Pass a shared limiter when fetching several endpoints in the same event
+    loop; otherwise this endpoint gets the full MAX_REQUESTS_PER_SECOND.
+    """
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    if limiter is None:
+        limiter = AsyncLimiter(MAX_REQUESTS_PER_SECOND, 1.0)
+
+    async with aiohttp.ClientSession() as session:
+
+        async def fetch_bounded(offset: int) -> dict:
+            async with sem:
+                return await fetch_page(
+                    session, endpoint, offset, params, api_key, limiter=limiter
+                )
+
+        first_page = await fetch_page(
+            session, endpoint, 0, params, api_key, limiter=limiter
+        )
+        all_records = first_page.get("data", [])
+        total = first_page.get("meta", {}).get("total", 0)
+
+        if all_records:
+            # gather() preserves task order, so pages stay in offset order
+            pages = await asyncio.gather(
+                *(fetch_bounded(offset) for offset in range(MAX_LIMIT, total, MAX_LIMIT))
+            )
+            for page in pages:
+                all_records.extend(page.get("data", []))
+
+    print(f"  Total {endpoint} records fetched: {len(all_records)}")
+    return all_records
 
 
 def fetch_all_records(endpoint: str, params: dict = None, api_key: str = None) -> list:
     """Fetch all records from an endpoint, handling pagination."""
-    all_records = []
-    offset = 0
-    params = params or {}
+    return asyncio.run(fetch_all_records_async(endpoint, params, api_key=api_key))
 
-    while True:
-        params["offset"] = offset
-        params["limit"] = MAX_LIMIT
 
-        print(f"  Fetching {endpoint} offset={offset}...")
-        data = fetch_endpoint(endpoint, params, api_key=api_key)
+async def fetch_endpoints_async(endpoints: list, api_key: str = None) -> list:
+    """Fetch all records from several endpoints concurrently under one shared rate limit."""
+    limiter = AsyncLimiter(MAX_REQUESTS_PER_SECOND, 1.0)
+    return await asyncio.gather(
+        *(
+            fetch_all_records_async(endpoint, api_key=api_key, limiter=limiter)
+            for endpoint in endpoints
+        )
+    )
 
-        records = data.get("data", [])
-        if not records:
-            break
 
-        all_records.extend(records)
+def load_etag_cache() -> dict:
+    """Load cached ETag/Last-Modified validators, keyed by URL."""
+    if not ETAG_CACHE_FILE.exists():
+        return {}
+    with open(ETAG_CACHE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-        # Check if we've fetched all records
-        total = data.get("meta", {}).get("total", 0)
-        offset += len(records)
 
-        if offset >= total:
-            break
+def save_etag_cache(cache: dict) -> None:
+    """Save ETag/Last-Modified validators (written to a temp file, then swapped in)."""
+    ETAG_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = ETAG_CACHE_FILE.with_name(f"{ETAG_CACHE_FILE.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, ETAG_CACHE_FILE)
 
-    print(f"  Total records fetched: {len(all_records)}")
-    return all_records
+
+def conditional_get(url: str, cache: dict) -> requests.Response:
+    """
+    GET url, sending cached validators as If-None-Match / If-Modified-Since.
+
+    Validators are only sent while the locally saved copy still exists, so a
+    304 Not Modified response always means the local file can be reused.
+    """
+    headers = {}
+    entry = cache.get(url)
+    if entry and Path(entry["path"]).exists():
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = SESSION.get(url, headers=headers)
+    response.raise_for_status()
+    return response
+
+
+def update_etag_cache(cache: dict, url: str, response: requests.Response, filepath: Path) -> None:
+    """Record validators from a 200 response and the file it was saved to."""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not (etag or last_modified):
+        cache.pop(url, None)
+    else:
+        cache[url] = {"etag": etag, "last_modified": last_modified, "path": str(filepath)}
 
 
 def save_json(data: list, filepath: Path) -> None:
     """Save data as JSON file."""
     filepath.parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if orjson is not None:
+        # Serialize to a single bytes blob and write it in one call
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filepath, "w", encoding="utf-8", buffering=1 << 20) as f:
+            json.dump(data, f, indent=2)
     print(f"  Saved: {filepath}")
 
 
 def download_yaml_definitions() -> None:
     """Download YAML variable definition files."""
     print("\nDownloading variable definition files...")
+    cache = load_etag_cache()
 
     for endpoint, filename in YAML_FILES.items():
         url = f"{DOCS_URL}/{filename}"
         filepath = RAW_DATA_DIR / filename
 
         print(f"  Fetching {filename}...")
-        response = requests.get(url)
-        response.raise_for_status()
+        response = conditional_get(url, cache)
+        if response.status_code == 304:
+            print(f"  Not modified, using: {cache[url]['path']}")
+            continue
 
         with open(filepath, "w", encoding="utf-8") as f:
             f.write(response.text)
+        update_etag_cache(cache, url, response, filepath)
         print(f"  Saved: {filepath}")
 
+    save_etag_cache(cache)
 
-def download_failures(api_key: str = None) -> None:
-    """Download bank failures data."""
-    print("\nDownloading bank failures data...")
-
-    records = fetch_all_records("failures", api_key=api_key)
-
-    timestamp = datetime.now().strftime("%Y%m%d")
-    save_json(records, RAW_DATA_DIR / f"failures_{timestamp}.json")
 
+def download_data(api_key: str = None) -> None:
+    """
+    Download bank failures and institutions data to timestamped JSON files.
 
-def download_institutions(api_key: str = None) -> None:
-    """Download bank institutions data."""
-    print("\nDownloading bank institutions data...")
+    Both endpoints are fetched in one event loop so they share the rate limit.
+    Data endpoints are always downloaded in full: a validator on one page
+    can't show that the rest of the paginated dataset is unchanged.
+    """
+    print("\nDownloading bank failures and institutions data...")
 
-    records = fetch_all_records("institutions", api_key=api_key)
+    results = asyncio.run(fetch_endpoints_async(DATA_ENDPOINTS, api_key=api_key))
 
     timestamp = datetime.now().strftime("%Y%m%d")
-    save_json(records, RAW_DATA_DIR / f"institutions_{timestamp}.json")
+    for endpoint, records in zip(DATA_ENDPOINTS, results):
+        save_json(records, RAW_DATA_DIR / f"{endpoint}_{timestamp}.json")
 
 
 def parse_args():
@@ -157,9 +308,14 @@ def main():
 
     RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    download_yaml_definitions()
-    download_failures(api_key=api_key)
-    download_institutions(api_key=api_key)
+    # Downloads are independent, so overlap their network I/O
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(download_yaml_definitions),
+            executor.submit(download_data, api_key=api_key),
+        ]
+        for future in futures:
+            future.result()
 
     print("\nDownload complete!")
 
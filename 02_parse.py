@@ -5,22 +5,60 @@ Reads raw data from data/raw/ and outputs parquet files to data/processed/
 with variable descriptions incorporated from YAML definition files.
 
 Usage:
-    python 02_parse.py          # Skip if output exists
-    python 02_parse.py --force  # Overwrite existing output
+    python 02_parse.py               # Skip if output exists
+    python 02_parse.py --force       # Overwrite existing output
+    python 02_parse.py --low-memory  # Stream raw JSON with ijson
 """
 
 import argparse
 import csv
 import json
+import mmap
+import pickle
 import yaml
+import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
 from datetime import datetime
 
+# Use libyaml's C loader when available
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Optional: streaming / faster JSON parsing
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Fields that contain dates in M/D/YYYY format
 DATE_FIELDS = {"FAILDATE", "RESDATE", "BRDATE", "PTRDATE"}
 
+# Number of leading records used to infer the parquet schema
+SCHEMA_SAMPLE_SIZE = 1000
+
+# String fields with fewer distinct values than this in the schema sample
+# (or with an enum in the YAML definitions) are dictionary-encoded
+DICTIONARY_MAX_DISTINCT = 100
+
+# Number of records converted from Python dicts to Arrow at a time
+BATCH_SIZE = 4096
+
+# Number of rows buffered as Arrow data and written as one parquet row group
+ROW_GROUP_SIZE = 262144
+
 # Directories
 PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -46,10 +84,29 @@ def output_exists(pattern: str) -> bool:
     return len(files) > 0
 
 
-def load_json(filepath: Path) -> list:
-    """Load JSON data file."""
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+def iter_records(filepath: Path, low_memory: bool = False) -> Iterator[dict]:
+    """
+    Yield records from a JSON data file, flattening nested 'data' structure if present.
+
+    By default the whole file is parsed with orjson from a memory map (or with
+    the stdlib json module), which is fastest. With low_memory, records are
+    streamed with ijson instead so only a small batch is held at a time.
+    """
+    if low_memory and ijson is None:
+        print("  Warning: ijson not installed; --low-memory has no effect")
+
+    with open(filepath, "rb") as f:
+        if low_memory and ijson is not None:
+            records = ijson.items(f, "item", use_float=True)
+        elif orjson is not None:
+            # Parse straight from the page-cache-backed mapping, no read() copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as mv:
+                records = orjson.loads(mv)
+        else:
+            records = json.load(f)
+
+        for record in records:
+            yield record["data"] if "data" in record else record
 
 
 def load_variable_definitions(yaml_path: Path) -> dict:
@@ -57,31 +114,38 @@ def load_variable_definitions(yaml_path: Path) -> dict:
     Load variable definitions from YAML file.
 
     Returns dict mapping field names to their metadata (title, description, type).
+    Parsed definitions are cached in a pickle sidecar that is reused until the
+    YAML file is modified.
     """
     if not yaml_path.exists():
         print(f"  Warning: {yaml_path} not found")
         return {}
 
-    with open(yaml_path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    cache_path = yaml_path.with_suffix(".yaml.pkl")
+    if cache_path.exists() and cache_path.stat().st_mtime >= yaml_path.stat().st_mtime:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
 
-    if not data:
-        return {}
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=SafeLoader)
 
     # Extract properties from nested structure
-    properties = data.get("properties", {}).get("data", {}).get("properties", {})
+    properties = {}
+    if data:
+        properties = data.get("properties", {}).get("data", {}).get("properties", {})
+
+    with open(cache_path, "wb") as f:
+        pickle.dump(properties, f)
     return properties
 
 
-def flatten_records(records: list) -> list:
-    """Flatten nested 'data' structure if present."""
-    flat_data = []
-    for record in records:
-        if "data" in record:
-            flat_data.append(record["data"])
-        else:
-            flat_data.append(record)
-    return flat_data
+def is_low_cardinality(key: str, distinct_values: set, sample_size: int, var_defs: dict) -> bool:
+    """Check if a string field should be dictionary-encoded."""
+    if "enum" in var_defs.get(key, {}):
+        return True
+    # Small samples make every field look low-cardinality; require repeats too
+    num_distinct = len(distinct_values)
+    return num_distinct < DICTIONARY_MAX_DISTINCT and num_distinct * 2 <= sample_size
 
 
 def build_schema_with_metadata(records: list, var_defs: dict) -> pa.Schema:
@@ -89,10 +153,18 @@ def build_schema_with_metadata(records: list, var_defs: dict) -> pa.Schema:
     if not records:
         return pa.schema([])
 
-    # Get all unique keys
+    # Collect all unique keys, the first non-null value and distinct string
+    # values for each in one pass
     all_keys = set()
+    samples = {}
+    distinct = {}
     for record in records:
         all_keys.update(record.keys())
+        for key, value in record.items():
+            if value is not None and key not in samples:
+                samples[key] = value
+            if isinstance(value, str):
+                distinct.setdefault(key, set()).add(value)
 
     fields = []
     for key in sorted(all_keys):
@@ -101,11 +173,7 @@ def build_schema_with_metadata(records: list, var_defs: dict) -> pa.Schema:
             pa_type = pa.date32()
         else:
             # Determine field type from data
-            sample_value = None
-            for record in records:
-                if key in record and record[key] is not None:
-                    sample_value = record[key]
-                    break
+            sample_value = samples.get(key)
 
             if isinstance(sample_value, bool):
                 pa_type = pa.bool_()
@@ -113,6 +181,10 @@ def build_schema_with_metadata(records: list, var_defs: dict) -> pa.Schema:
                 pa_type = pa.int64()
             elif isinstance(sample_value, float):
                 pa_type = pa.float64()
+            elif isinstance(sample_value, str) and is_low_cardinality(
+                key, distinct[key], len(records), var_defs
+            ):
+                pa_type = pa.dictionary(pa.int32(), pa.string())
             else:
                 pa_type = pa.string()
 
@@ -135,8 +207,13 @@ def build_schema_with_metadata(records: list, var_defs: dict) -> pa.Schema:
     return pa.schema(fields)
 
 
+@lru_cache(maxsize=65536)
 def parse_date(value):
-    """Parse date string in M/D/YYYY format to date object."""
+    """
+    Parse date string in M/D/YYYY format to date object.
+
+    Results are cached since date strings repeat heavily across records.
+    """
     if value is None or value == "":
         return None
     try:
@@ -157,7 +234,7 @@ def coerce_value(value, pa_type):
 
     if pa.types.is_date32(pa_type):
         return parse_date(value)
-    elif pa.types.is_string(pa_type):
+    elif pa.types.is_string(pa_type) or pa.types.is_dictionary(pa_type):
         return str(value)
     elif pa.types.is_int64(pa_type):
         if isinstance(value, (int, float)):
@@ -179,34 +256,197 @@ def coerce_value(value, pa_type):
     return value
 
 
-def save_parquet(records: list, filepath: Path, var_defs: dict) -> None:
-    """Save data as parquet file with metadata."""
-    if not records:
+def parse_date_column(values: list) -> pa.Array:
+    """Parse a column of date strings in M/D/YYYY format to a date32 array."""
+    raw = pd.Series(values, dtype="object")
+    dates = pd.to_datetime(raw, format="%m/%d/%Y", errors="coerce")
+
+    # Retry unparsed values as YYYY-MM-DD, the same fallback parse_date uses
+    unparsed = dates.isna() & raw.notna() & (raw != "")
+    if unparsed.any():
+        dates[unparsed] = pd.to_datetime(raw[unparsed], format="%Y-%m-%d", errors="coerce")
+        unparsed &= dates.isna()
+
+    array = pa.Array.from_pandas(dates).cast(pa.date32())
+
+    # Dates outside the pandas timestamp range (1677-2262 for nanoseconds)
+    # still fail above; parse those few one by one
+    if unparsed.any():
+        fallback = [
+            parse_date(value) if todo and isinstance(value, str) else None
+            for value, todo in zip(values, unparsed)
+        ]
+        array = pc.if_else(
+            pa.array(unparsed.to_numpy()), pa.array(fallback, type=pa.date32()), array
+        )
+
+    return array
+
+
+def blank_to_null(array: pa.Array) -> pa.Array:
+    """Replace empty strings with nulls, matching coerce_value."""
+    return pc.if_else(pc.equal(array, ""), pa.scalar(None, array.type), array)
+
+
+def build_column(values: list, pa_type: pa.DataType) -> pa.Array:
+    """Convert a column of raw values to an Arrow array of pa_type."""
+    # Dictionary fields are built as plain strings, then encoded after cleanup
+    build_type = pa.string() if pa.types.is_dictionary(pa_type) else pa_type
+    try:
+        array = pa.array(values, type=build_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Some values don't match the inferred type; coerce this column one by one
+        return pa.array([coerce_value(value, pa_type) for value in values], type=pa_type)
+
+    if pa.types.is_string(build_type):
+        array = blank_to_null(array).cast(pa_type)
+    return array
+
+
+def records_to_batch(records: list, schema: pa.Schema) -> pa.RecordBatch:
+    """Convert a list of records to a RecordBatch matching schema."""
+    arrays = []
+    for field in schema:
+        values = [record.get(field.name) for record in records]
+        if pa.types.is_date32(field.type):
+            # Arrow can't parse M/D/YYYY strings, so date fields are parsed separately
+            arrays.append(parse_date_column(values))
+        else:
+            arrays.append(build_column(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def widen_schema(
+    schema: pa.Schema, records: list, var_defs: dict, retype: set = frozenset()
+) -> pa.Schema:
+    """
+    Add fields for keys in records that schema doesn't have yet.
+
+    Fields named in retype (so far all-null, typed as strings by default) are
+    replaced with the type inferred from records.
+    """
+    record_schema = build_schema_with_metadata(records, var_defs)
+    fields = {field.name: field for field in schema}
+    for field in record_schema:
+        if field.name not in fields or field.name in retype:
+            fields[field.name] = field
+    return pa.schema(sorted(fields.values(), key=lambda field: field.name))
+
+
+def conform_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """
+    Reorder table columns to match schema, adding null columns for new fields.
+
+    Retyped columns are cast; they only ever held nulls, so the cast is lossless.
+    """
+    arrays = []
+    for field in schema:
+        if field.name not in table.column_names:
+            arrays.append(pa.nulls(table.num_rows, field.type))
+        else:
+            column = table.column(field.name)
+            arrays.append(column if column.type == field.type else column.cast(field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def open_parquet_writer(filepath: Path, schema: pa.Schema) -> pq.ParquetWriter:
+    """Open a parquet writer with the pipeline's compression settings."""
+    return pq.ParquetWriter(
+        filepath,
+        schema,
+        compression="zstd",
+        compression_level=3,
+        use_dictionary=True,  # Low-cardinality codes (states, classes) compress well
+        data_page_size=1 << 20,
+    )
+
+
+def write_row_group(
+    writer: pq.ParquetWriter, filepath: Path, schema: pa.Schema, tables: list
+) -> pq.ParquetWriter:
+    """Write buffered tables as one row group, opening the writer on first use."""
+    if writer is None:
+        writer = open_parquet_writer(filepath, schema)
+    writer.write_table(pa.concat_tables(tables), row_group_size=ROW_GROUP_SIZE)
+    return writer
+
+
+def save_parquet(records: Iterable[dict], filepath: Path, var_defs: dict) -> None:
+    """
+    Save data as parquet file with metadata.
+
+    Records are consumed in a single pass and converted to Arrow BATCH_SIZE
+    at a time, so only one small batch of Python dicts is held at once; the
+    compact Arrow data is buffered and written every ROW_GROUP_SIZE rows.
+    The schema is inferred from the first SCHEMA_SAMPLE_SIZE records and
+    widened if later records introduce new fields or the first non-null values
+    of fields that were all null so far; data already converted or written is
+    then conformed to the updated schema.
+    """
+    records = iter(records)
+    sample = list(islice(records, SCHEMA_SAMPLE_SIZE))
+    if not sample:
         print(f"  No data to save for {filepath}")
         return
 
     filepath.parent.mkdir(parents=True, exist_ok=True)
 
     # Build schema with metadata
-    schema = build_schema_with_metadata(records, var_defs)
+    schema = build_schema_with_metadata(sample, var_defs)
 
-    # Convert records to columnar format with type coercion
-    columns = {field.name: [] for field in schema}
-    for record in records:
-        for field in schema:
-            raw_value = record.get(field.name)
-            coerced_value = coerce_value(raw_value, field.type)
-            columns[field.name].append(coerced_value)
+    # Fields with no non-null value yet default to strings until one shows up
+    typed = {key for record in sample for key, value in record.items() if value is not None}
+    untyped = set(schema.names) - typed - DATE_FIELDS
 
-    # Create table and write parquet
-    table = pa.table(columns, schema=schema)
-    pq.write_table(table, filepath)
+    writer = None
+    pending = []  # Converted tables not yet written as a row group
+    pending_rows = 0
+    num_records = 0
+    records = chain(sample, records)
+    try:
+        while batch := list(islice(records, BATCH_SIZE)):
+            new_keys = set().union(*batch) - set(schema.names)
+            resolved = {
+                key for key in untyped
+                if any(record.get(key) is not None for record in batch)
+            }
+            if new_keys or resolved:
+                if new_keys:
+                    print(f"  New fields after record {num_records}: {', '.join(sorted(new_keys))}")
+                if resolved:
+                    print(f"  Typed fields after record {num_records}: {', '.join(sorted(resolved))}")
+                schema = widen_schema(schema, batch, var_defs, retype=resolved)
+                untyped -= resolved
+                untyped |= {
+                    key for key in new_keys - DATE_FIELDS
+                    if all(record.get(key) is None for record in batch)
+                }
+                pending = [conform_table(table, schema) for table in pending]
+                if writer is not None:
+                    writer.close()
+                    written = pq.read_table(filepath)
+                    writer = open_parquet_writer(filepath, schema)
+                    writer.write_table(conform_table(written, schema), row_group_size=ROW_GROUP_SIZE)
+
+            pending.append(pa.Table.from_batches([records_to_batch(batch, schema)]))
+            pending_rows += len(batch)
+            num_records += len(batch)
+            batch = None  # Release these dicts before the next batch is built
+            if pending_rows >= ROW_GROUP_SIZE:
+                writer = write_row_group(writer, filepath, schema, pending)
+                pending, pending_rows = [], 0
+
+        if pending:
+            writer = write_row_group(writer, filepath, schema, pending)
+    finally:
+        if writer is not None:
+            writer.close()
 
     print(f"  Saved: {filepath}")
-    print(f"  Records: {len(records)}, Fields: {len(schema)}")
+    print(f"  Records: {num_records}, Fields: {len(schema)}")
 
 
-def parse_failures(force: bool = False) -> None:
+def parse_failures(force: bool = False, low_memory: bool = False) -> None:
     """Parse bank failures data."""
     print("\nParsing bank failures data...")
 
@@ -221,8 +461,7 @@ def parse_failures(force: bool = False) -> None:
         return
 
     print(f"  Reading: {latest_file}")
-    records = load_json(latest_file)
-    flat_data = flatten_records(records)
+    records = iter_records(latest_file, low_memory=low_memory)
 
     # Load variable definitions
     yaml_path = RAW_DATA_DIR / YAML_FILES["failures"]
@@ -230,10 +469,10 @@ def parse_failures(force: bool = False) -> None:
     print(f"  Variable definitions loaded: {len(var_defs)} fields")
 
     timestamp = datetime.now().strftime("%Y%m%d")
-    save_parquet(flat_data, PROCESSED_DATA_DIR / f"failures_{timestamp}.parquet", var_defs)
+    save_parquet(records, PROCESSED_DATA_DIR / f"failures_{timestamp}.parquet", var_defs)
 
 
-def parse_institutions(force: bool = False) -> None:
+def parse_institutions(force: bool = False, low_memory: bool = False) -> None:
     """Parse bank institutions data."""
     print("\nParsing bank institutions data...")
 
@@ -248,8 +487,7 @@ def parse_institutions(force: bool = False) -> None:
         return
 
     print(f"  Reading: {latest_file}")
-    records = load_json(latest_file)
-    flat_data = flatten_records(records)
+    records = iter_records(latest_file, low_memory=low_memory)
 
     # Load variable definitions
     yaml_path = RAW_DATA_DIR / YAML_FILES["institutions"]
@@ -257,7 +495,7 @@ def parse_institutions(force: bool = False) -> None:
     print(f"  Variable definitions loaded: {len(var_defs)} fields")
 
     timestamp = datetime.now().strftime("%Y%m%d")
-    save_parquet(flat_data, PROCESSED_DATA_DIR / f"institutions_{timestamp}.parquet", var_defs)
+    save_parquet(records, PROCESSED_DATA_DIR / f"institutions_{timestamp}.parquet", var_defs)
 
 
 def create_data_dictionary() -> None:
@@ -309,6 +547,11 @@ def main():
         action="store_true",
         help="Overwrite existing output files"
     )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Stream raw JSON with ijson (slower, much lower peak memory)"
+    )
     args = parser.parse_args()
 
     print("FDIC Data Parse Script")
@@ -316,8 +559,8 @@ def main():
 
     PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    parse_failures(force=args.force)
-    parse_institutions(force=args.force)
+    parse_failures(force=args.force, low_memory=args.low_memory)
+    parse_institutions(force=args.force, low_memory=args.low_memory)
     create_data_dictionary()
 
     print("\nParsing complete!")
@@ -12,6 +12,8 @@ Usage:
 """
 
 import argparse
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 from pathlib import Path
 from datetime import datetime
@@ -27,10 +29,10 @@ def get_latest_file(pattern: str) -> Path | None:
     return files[-1] if files else None
 
 
-def summarize_parquet(filepath: Path) -> dict:
-    """Generate summary statistics for a parquet file."""
-    table = pq.read_table(filepath)
-    schema = table.schema
+def summarize_parquet(filepath: Path) -> tuple:
+    """Generate summary statistics for a parquet file from its metadata."""
+    schema = pq.read_schema(filepath)
+    num_rows = pq.read_metadata(filepath).num_rows
 
     # Count fields with metadata
     fields_with_title = sum(1 for f in schema if f.metadata and b"title" in f.metadata)
@@ -38,14 +40,36 @@ def summarize_parquet(filepath: Path) -> dict:
 
     summary = {
         "file": filepath.name,
-        "records": table.num_rows,
+        "records": num_rows,
         "fields": len(schema),
         "fields_with_title": fields_with_title,
         "fields_with_description": fields_with_desc,
         "file_size_mb": filepath.stat().st_size / (1024 * 1024),
     }
 
-    return summary, table, schema
+    return summary, schema
+
+
+def read_columns(filepath: Path, schema: pa.Schema, columns: list) -> pa.Table:
+    """Read only the given columns (those present in schema) from a parquet file."""
+    return pq.read_table(filepath, columns=[c for c in columns if c in schema.names])
+
+
+def column_range(column: pa.ChunkedArray) -> tuple:
+    """Return (min, max) of a column, decoding dictionary-encoded columns first."""
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    value_range = pc.min_max(column)
+    return value_range["min"], value_range["max"]
+
+
+def top_counts(column: pa.ChunkedArray, n: int = None) -> list:
+    """Return (value, count) pairs for non-null values, most frequent first."""
+    counts = pc.value_counts(pc.drop_null(column))
+    order = pc.array_sort_indices(counts.field("counts"), order="descending")
+    if n is not None:
+        order = order[:n]
+    return [(item["values"], item["counts"]) for item in counts.take(order).to_pylist()]
 
 
 def summarize_failures() -> None:
@@ -59,7 +83,7 @@ def summarize_failures() -> None:
         print("  No failures data found in data/processed/")
         return
 
-    summary, table, schema = summarize_parquet(filepath)
+    summary, schema = summarize_parquet(filepath)
 
     print(f"\nFile: {summary['file']}")
     print(f"Size: {summary['file_size_mb']:.2f} MB")
@@ -68,27 +92,27 @@ def summarize_failures() -> None:
     print(f"  - with title: {summary['fields_with_title']}")
     print(f"  - with description: {summary['fields_with_description']}")
 
+    table = read_columns(filepath, schema, ["FAILDATE", "FAILYR", "PSTALP"])
+
     # Date range analysis
-    df = table.to_pandas()
-    if "FAILDATE" in df.columns:
-        dates = df["FAILDATE"].dropna()
-        if len(dates) > 0:
-            min_date = dates.min()
-            max_date = dates.max()
+    if "FAILDATE" in table.column_names:
+        dates = table.column("FAILDATE")
+        if dates.null_count < len(dates):
+            min_date, max_date = column_range(dates)
             print(f"\nDate Range:")
             print(f"  Earliest failure: {min_date}")
             print(f"  Latest failure: {max_date}")
 
-    if "FAILYR" in df.columns:
-        years = df["FAILYR"].dropna()
-        if len(years) > 0:
-            print(f"\nYear Range: {years.min()} - {years.max()}")
+    if "FAILYR" in table.column_names:
+        years = table.column("FAILYR")
+        if years.null_count < len(years):
+            min_year, max_year = column_range(years)
+            print(f"\nYear Range: {min_year} - {max_year}")
 
     # Top states by failures
-    if "PSTALP" in df.columns:
-        state_counts = df["PSTALP"].value_counts().head(5)
+    if "PSTALP" in table.column_names:
         print(f"\nTop 5 States by Failures:")
-        for state, count in state_counts.items():
+        for state, count in top_counts(table.column("PSTALP"), 5):
             print(f"  {state}: {count:,}")
 
 
@@ -103,7 +127,7 @@ def summarize_institutions() -> None:
         print("  No institutions data found in data/processed/")
         return
 
-    summary, table, schema = summarize_parquet(filepath)
+    summary, schema = summarize_parquet(filepath)
 
     print(f"\nFile: {summary['file']}")
     print(f"Size: {summary['file_size_mb']:.2f} MB")
@@ -113,28 +137,34 @@ def summarize_institutions() -> None:
     print(f"  - with description: {summary['fields_with_description']}")
 
     # Additional analysis
-    df = table.to_pandas()
+    table = read_columns(filepath, schema, ["ACTIVE", "STNAME", "BKCLASS"])
 
-    if "ACTIVE" in df.columns:
-        active_counts = df["ACTIVE"].value_counts()
+    if "ACTIVE" in table.column_names:
         print(f"\nInstitution Status:")
-        for status, count in active_counts.items():
+        for status, count in top_counts(table.column("ACTIVE")):
             label = "Active" if str(status) == "1" else "Inactive"
             print(f"  {label}: {count:,}")
 
-    if "STNAME" in df.columns:
-        state_counts = df["STNAME"].value_counts().head(5)
+    if "STNAME" in table.column_names:
         print(f"\nTop 5 States by Institution Count:")
-        for state, count in state_counts.items():
+        for state, count in top_counts(table.column("STNAME"), 5):
             print(f"  {state}: {count:,}")
 
-    if "BKCLASS" in df.columns:
-        class_counts = df["BKCLASS"].value_counts()
+    if "BKCLASS" in table.column_names:
         print(f"\nInstitution Classes:")
-        for bkclass, count in class_counts.items():
+        for bkclass, count in top_counts(table.column("BKCLASS")):
             print(f"  {bkclass}: {count:,}")
 
 
+def short_type_name(pa_type: pa.DataType) -> str:
+    """Short display name for a field type (fits the 10-character Type column)."""
+    if pa.types.is_dictionary(pa_type):
+        return "category"  # Dictionary-encoded strings
+    if pa.types.is_date32(pa_type):
+        return "date32"
+    return str(pa_type)
+
+
 def list_fields(dataset: str) -> None:
     """List all fields with their metadata."""
     pattern = f"{dataset}_*.parquet"
@@ -144,8 +174,7 @@ def list_fields(dataset: str) -> None:
         print(f"  No {dataset} data found")
         return
 
-    table = pq.read_table(filepath)
-    schema = table.schema
+    schema = pq.read_schema(filepath)
 
     print(f"\n{'Field':<20} {'Type':<10} {'Title'}")
     print("-" * 70)
@@ -154,7 +183,7 @@ def list_fields(dataset: str) -> None:
         title = ""
         if field.metadata and b"title" in field.metadata:
             title = field.metadata[b"title"].decode("utf-8")
-        print(f"{field.name:<20} {str(field.type):<10} {title}")
+        print(f"{field.name:<20} {short_type_name(field.type):<10} {title}")
 
 
 def main():
@@ -11,6 +11,8 @@ Usage:
 """
 
 import argparse
+import fnmatch
+import os
 from pathlib import Path
 
 # Directories
@@ -19,16 +21,20 @@ RAW_DATA_DIR = PROJECT_ROOT / "data" / "raw"
 PROCESSED_DATA_DIR = PROJECT_ROOT / "data" / "processed"
 
 # File patterns to clean
-RAW_PATTERNS = ["*.json", "*.yaml"]
+RAW_PATTERNS = ["*.json", "*.yaml", "*.yaml.pkl"]
 PROCESSED_PATTERNS = ["*.parquet", "*.json", "*.csv"]
 
 
 def get_files(directory: Path, patterns: list) -> list:
-    """Get all files matching patterns in directory."""
-    files = []
-    for pattern in patterns:
-        files.extend(directory.glob(pattern))
-    return sorted(files)
+    """Get all files matching patterns in directory as os.DirEntry objects."""
+    if not directory.is_dir():
+        return []
+    with os.scandir(directory) as entries:
+        files = [
+            entry for entry in entries
+            if entry.is_file() and any(fnmatch.fnmatch(entry.name, p) for p in patterns)
+        ]
+    return sorted(files, key=lambda entry: entry.name)
 
 
 def format_size(size_bytes: int) -> str:
@@ -46,15 +52,15 @@ def cleanup_files(files: list, dry_run: bool = False) -> tuple:
     total_size = 0
     deleted_count = 0
 
-    for filepath in files:
-        size = filepath.stat().st_size
+    for entry in files:
+        size = entry.stat().st_size
         total_size += size
 
         if dry_run:
-            print(f"  Would delete: {filepath.name} ({format_size(size)})")
+            print(f"  Would delete: {entry.name} ({format_size(size)})")
         else:
-            filepath.unlink()
-            print(f"  Deleted: {filepath.name} ({format_size(size)})")
+            os.unlink(entry.path)
+            print(f"  Deleted: {entry.name} ({format_size(size)})")
             deleted_count += 1
 
     return deleted_count if not dry_run else len(files), total_size